@@ -1,7 +1,14 @@
 import sys
-from .estimation.cli import main as estimation_main
-from .evaluation.cli import main as evaluation_main
-from .sweep.cli import main as sweep_main
+import importlib
+
+
+# Modules providing the main function of every mode. They are only imported
+# when the mode is requested.
+MODES = {
+    "estimation": ".estimation.cli",
+    "evaluation": ".evaluation.cli",
+    "sweep": ".sweep.cli",
+}
 
 
 def main():
@@ -18,22 +25,15 @@ def main():
 
     mode = sys.argv[1]
 
-    if mode == "estimation":
-        return estimation_main()
-
-    elif mode == "evaluation":
-        return evaluation_main()
-
-    elif mode == "sweep":
-        return sweep_main()
-
-    else:
+    if mode not in MODES:
         print(
             f"Unknown mode '{mode}'.",
             file=sys.stderr
         )
         return print_usage()
 
+    return importlib.import_module(MODES[mode], __package__).main()
+
 
 def print_usage():
     print(
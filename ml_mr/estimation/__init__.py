@@ -1,38 +1,46 @@
+from collections.abc import Mapping
+from importlib import import_module
+from typing import Callable, Dict, Iterator
+
 from .core import MREstimator, MREstimatorWithUncertainty, EnsembleMREstimator
 
-from . import deep_iv
-from . import quantile_iv
-from . import baselines
-from . import dfiv
-from . import delivr
-
-MODELS = {
-    "quantile_iv": {
-        "estimate": quantile_iv.estimate,
-        "load": quantile_iv.load
-    },
-    "doubly_ranked": {
-        "estimate": baselines.doubly_ranked.estimate,
-        "load": baselines.doubly_ranked.load
-    },
-    "2sls": {
-        "estimate": baselines.linear_two_stage.estimate,
-        "load": baselines.linear_two_stage.load
-    },
-    "logistic_control_function": {
-        "estimate": baselines.logistic_control_function.estimate,
-        "load": baselines.logistic_control_function.load
-    },
-    "deep_iv": {
-        "estimate": deep_iv.estimate,
-        "load": deep_iv.load
-    },
-    "dfiv": {
-        "estimate": dfiv.estimate,
-        "load": dfiv.load
-    },
-    "delivr": {
-        "estimate": delivr.estimate,
-        "load": delivr.load
-    },
+
+# Modules implementing the models. They are only imported when the model is
+# looked up in MODELS (or the module is accessed as an attribute).
+_MODEL_MODULES = {
+    "quantile_iv": ".quantile_iv",
+    "doubly_ranked": ".baselines.doubly_ranked",
+    "2sls": ".baselines.linear_two_stage",
+    "logistic_control_function": ".baselines.logistic_control_function",
+    "deep_iv": ".deep_iv",
+    "dfiv": ".dfiv",
+    "delivr": ".delivr",
 }
+
+_SUBMODULES = {"deep_iv", "quantile_iv", "baselines", "dfiv", "delivr"}
+
+
+class _LazyModels(Mapping):
+    """Maps model names to their estimate and load functions."""
+    def __getitem__(self, name: str) -> Dict[str, Callable]:
+        module = import_module(_MODEL_MODULES[name], __name__)
+        return {
+            "estimate": module.estimate,
+            "load": module.load
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_MODEL_MODULES)
+
+    def __len__(self) -> int:
+        return len(_MODEL_MODULES)
+
+
+MODELS = _LazyModels()
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return import_module(f".{name}", __name__)
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -8,6 +8,7 @@ from linearmodels.iv.results import IVResults
 import torch
 
 from ..core import MREstimator
+from ...utils import write_json
 from ...utils.data import IVDataset
 
 
@@ -59,11 +60,9 @@ def fit_2sls(
         "exposure_se": iv_results.std_errors[cols["exposure"]].to_list()
     }
 
-    with open(os.path.join(output_dir, "2sls_fit.json"), "wt") as f:
-        json.dump(estimates, f)
+    write_json(estimates, os.path.join(output_dir, "2sls_fit.json"))
 
-    with open(os.path.join(output_dir, "meta.json"), "wt") as f:
-        json.dump(meta, f)
+    write_json(meta, os.path.join(output_dir, "meta.json"))
 
     return TwoSLSEstimator(**estimates, meta=meta)
 
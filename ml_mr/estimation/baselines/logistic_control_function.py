@@ -38,6 +38,7 @@ except ImportError:
 
 
 from ..core import MREstimator
+from ...utils import write_json
 from ...utils.data import IVDataset
 
 
@@ -85,13 +86,12 @@ def fit_logistic_control_function(
     )
 
     # Serialize results in json format.
-    with open(
-        os.path.join(output_dir, "logistic_control_function_fit.json"), "wt"
-    ) as f:
-        json.dump(iv_results, f)
+    write_json(
+        iv_results,
+        os.path.join(output_dir, "logistic_control_function_fit.json")
+    )
 
-    with open(os.path.join(output_dir, "meta.json"), "wt") as f:
-        json.dump(meta, f)
+    write_json(meta, os.path.join(output_dir, "meta.json"))
 
     return LogisticControlFunctionEstimator(**iv_results, meta=meta)
 
@@ -7,26 +7,17 @@ This is mostly a dispatch into the implemented algorithms.
 
 import sys
 import argparse
+import importlib
 
-from .quantile_iv import (
-    configure_argparse as quantile_iv_configure_argparse,
-    main as quantile_iv_main
-)
 
-from .deep_iv import (
-    configure_argparse as deep_iv_configure_argparse,
-    main as deep_iv_main
-)
-
-from .dfiv import (
-    configure_argparse as dfiv_configure_argparse,
-    main as dfiv_main
-)
-
-from .delivr import (
-    configure_argparse as delivr_configure_argparse,
-    main as delivr_main
-)
+# Modules providing the configure_argparse and main functions of the
+# algorithms. They are only imported when the algorithm is requested.
+ALGORITHMS = {
+    "quantile_iv": ".quantile_iv",
+    "deep_iv": ".deep_iv",
+    "dfiv": ".dfiv",
+    "delivr": ".delivr",
+}
 
 
 def main():
@@ -43,26 +34,15 @@ def main():
         title="algorithm", dest="algorithm", required=True
     )
 
-    quantile_iv_parser = algorithms.add_parser("quantile_iv")
-    quantile_iv_configure_argparse(quantile_iv_parser)
-
-    deep_iv_parser = algorithms.add_parser("deep_iv")
-    deep_iv_configure_argparse(deep_iv_parser)
+    requested = sys.argv[2] if len(sys.argv) > 2 else None
 
-    dfiv_parser = algorithms.add_parser("dfiv")
-    dfiv_configure_argparse(dfiv_parser)
-
-    delivr_parser = algorithms.add_parser("delivr")
-    delivr_configure_argparse(delivr_parser)
+    for name, module_name in ALGORITHMS.items():
+        algorithm_parser = algorithms.add_parser(name)
+        if name == requested:
+            module = importlib.import_module(module_name, __package__)
+            module.configure_argparse(algorithm_parser)
 
     args = parser.parse_args(sys.argv[2:])
-    if args.algorithm == "quantile_iv":
-        quantile_iv_main(args)
-    elif args.algorithm == "deep_iv":
-        deep_iv_main(args)
-    elif args.algorithm == "dfiv":
-        dfiv_main(args)
-    elif args.algorithm == "delivr":
-        delivr_main(args)
-    else:
-        raise ValueError("Invalid algorithm.")
+
+    module = importlib.import_module(ALGORITHMS[args.algorithm], __package__)
+    module.main(args)
@@ -5,6 +5,8 @@ import torch
 from scipy.interpolate import interp1d
 
 from ..logging import info
+from ..utils.interpolation import (linear_interpolator,
+                                   cubic_spline_interpolator)
 
 
 INTERPOLATION = ["linear", "quadratic", "cubic"]
@@ -70,10 +72,9 @@ class MREstimator(object):
 
         y_hats = self.iv_reg_function(x_rep, covars)
 
-        return torch.vstack([
-            tens.mean(dim=0, keepdim=True)
-            for tens in torch.split(y_hats, n_covars)
-        ])
+        # Average over the covariables for every x in a single reduction.
+        return y_hats.reshape(x.shape[0], n_covars, *y_hats.shape[1:])\
+            .mean(dim=1)
 
     def _low_mem_avg_iv_reg_function(self, x: torch.Tensor) -> torch.Tensor:
         avgs = []
@@ -121,18 +122,33 @@ class MREstimator(object):
         if mode not in INTERPOLATION:
             raise ValueError(f"Unknown interpolation type {mode}.")
 
-        if isinstance(xs, torch.Tensor):
-            xs = xs.numpy()
+        if mode == "quadratic":
+            # Not implemented in torch, we defer to scipy.
+            if isinstance(xs, torch.Tensor):
+                xs = xs.numpy()
 
-        if isinstance(ys, torch.Tensor):
-            ys = ys.numpy()
+            if isinstance(ys, torch.Tensor):
+                ys = ys.numpy()
 
-        interpolator = interp1d(xs, ys, kind=mode, bounds_error=bounds_error)
+            interpolator = interp1d(
+                xs, ys, kind=mode, bounds_error=bounds_error
+            )
+
+            def interpolate_torch(x):
+                return torch.from_numpy(interpolator(x))
+
+            return interpolate_torch
+
+        if not isinstance(xs, torch.Tensor):
+            xs = torch.tensor(np.asarray(xs))
+
+        if not isinstance(ys, torch.Tensor):
+            ys = torch.tensor(np.asarray(ys))
 
-        def interpolate_torch(x):
-            return torch.from_numpy(interpolator(x))
+        if mode == "linear":
+            return linear_interpolator(xs, ys, bounds_error=bounds_error)
 
-        return interpolate_torch
+        return cubic_spline_interpolator(xs, ys, bounds_error=bounds_error)
 
     @classmethod
     def from_results(
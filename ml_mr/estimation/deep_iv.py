@@ -12,9 +12,11 @@ import torch.nn as nn
 from torch.utils.data import Dataset, random_split
 
 from ..logging import info
-from ..utils import default_validate_args, parse_project_and_run_name, _cat
+from ..utils import (
+    default_validate_args, parse_project_and_run_name, _cat, write_json
+)
 from ..utils.data import (IVDataset, IVDatasetWithGenotypes,
-                          SupervisedLearningWrapper)
+                          SupervisedLearningWrapper, get_n_covars)
 from ..utils.models import (MLP, GaussianNet, MixtureDensityNetwork,
                             OutcomeMLPBase, RidgeDensity)
 from ..utils.nn import DensityModel
@@ -174,21 +176,17 @@ class DeepIVEstimator(MREstimator):
         with open(os.path.join(dir_name, "meta.json"), "rt") as f:
             meta = json.load(f)
 
-        try:
-            covars = torch.load(os.path.join(dir_name, "covariables.pt"))
-        except FileNotFoundError:
-            covars = None
-
-        cpu = torch.device("cpu")
+        covars = IVDataset.load_covariables(dir_name)
 
         exposure_network = _load_exposure_model_from_dir(
             dir_name, meta["exposure_network_type"]
-        ).to(cpu)
+        )
 
         outcome_network = OutcomeMLP.load_from_checkpoint(
             os.path.join(dir_name, "outcome_network.ckpt"),
-            exposure_network=exposure_network
-        ).to(cpu)
+            exposure_network=exposure_network,
+            map_location=torch.device("cpu")
+        )
 
         with open(os.path.join(dir_name, "meta.json")) as f:
             meta = json.load(f)
@@ -317,7 +315,7 @@ def train_outcome_model(
     wandb_project: Optional[str] = None
 ) -> float:
     info("Training outcome model.")
-    n_covars = train_dataset[0][3].numel()
+    n_covars = get_n_covars(train_dataset)
     model = OutcomeMLP(
         exposure_network=exposure_network,
         input_size=1 + n_covars,
@@ -353,7 +351,9 @@ def _load_exposure_model_from_dir(
 
     filename = os.path.join(dirname, "exposure_network.ckpt")
     exposure_network = NET_TO_CLASS[exposure_network_type]\
-        .load_from_checkpoint(filename).eval()  # type: ignore
+        .load_from_checkpoint(  # type: ignore
+            filename, map_location=torch.device("cpu")
+        ).eval()
 
     exposure_network.freeze()
     return exposure_network
@@ -452,8 +452,7 @@ def fit_deep_iv(
         exposure_network, outcome_network, meta, covars
     )
 
-    with open(os.path.join(output_dir, "meta.json"), "wt") as f:
-        json.dump(meta, f)
+    write_json(meta, os.path.join(output_dir, "meta.json"))
 
     if not fast:
         save_estimator_statistics(
@@ -18,12 +18,16 @@ import torch.nn as nn
 import torch.nn.functional as F
 from torch.utils.data import Dataset, random_split
 
-from ..utils import _cat, default_validate_args, parse_project_and_run_name
+from ..utils import (
+    CatBuffer, _cat, default_validate_args, parse_project_and_run_name,
+    write_json
+)
 from ..utils.linear import ridge_regression
 from ..utils.models import MLP
 from ..utils.training import train_model, resample_dataset
 from .core import MREstimator
-from ..utils.data import FullBatchDataLoader, IVDatasetWithGenotypes, IVDataset
+from ..utils.data import (FullBatchDataLoader, IVDatasetWithGenotypes,
+                          IVDataset, get_n_covars)
 
 DEFAULTS = {
     "hidden": [64, 32],
@@ -37,6 +41,10 @@ DEFAULTS = {
     "accelerator": "gpu" if (
         torch.cuda.is_available() and torch.cuda.device_count() > 0
     ) else "cpu",
+    # Mixed precision (e.g. 16-mixed) is opt-in.
+    "precision": "32-true",
+    "full_batch": False,
+    "num_workers": 0,
 }
 
 
@@ -45,9 +53,52 @@ def fit_lin_exposure_model(dataset: Dataset) -> torch.Tensor:
 
     x, _, ivs, covars = next(iter(dl))
 
+    # Solved as a least squares problem on the design matrix, which is more
+    # accurate than the normal equations.
     return ridge_regression(_cat(ivs, covars), x, alpha=0)
 
 
+def predict_lin_exposure_model(
+    betas: torch.Tensor,
+    ivs: torch.Tensor,
+    covars: torch.Tensor
+) -> torch.Tensor:
+    """Linear predictor for the stage 1 coefficients without concatenation."""
+    n_ivs = ivs.size(1)
+    x_hat = ivs @ betas[:n_ivs]
+    if covars.numel() > 0:
+        x_hat += covars @ betas[n_ivs:]
+
+    return x_hat
+
+
+class FittedExposureDataset(Dataset):
+    """Dataset for the 2nd stage where the IVs are replaced by E[X|Z].
+
+    The linear first stage is fixed during the outcome model training, so the
+    fitted exposure is computed once for the whole dataset instead of at every
+    training step.
+
+    The batches contain the fitted exposure, outcome and covariables.
+
+    """
+    def __init__(self, dataset: Dataset, betas: torch.Tensor):
+        _, y, ivs, covars = next(iter(FullBatchDataLoader(dataset)))
+
+        self.x_hat = predict_lin_exposure_model(betas, ivs, covars)
+        self.outcome = y
+        self.covariables = covars
+
+    def __getitem__(self, index: int):
+        return self.x_hat[index], self.outcome[index], self.covariables[index]
+
+    def __len__(self) -> int:
+        return self.x_hat.size(0)
+
+    def n_covars(self) -> int:
+        return self.covariables.size(1)
+
+
 def main(args: argparse.Namespace) -> None:
     default_validate_args(args)
     dataset = IVDatasetWithGenotypes.from_argparse_namespace(args)
@@ -77,6 +128,9 @@ def fit_delivr(
     batch_size: int = DEFAULTS["batch_size"],  # type: ignore
     max_epochs: int = DEFAULTS["max_epochs"],  # type: ignore
     accelerator: str = DEFAULTS["accelerator"],  # type: ignore
+    precision: str = DEFAULTS["precision"],  # type: ignore
+    full_batch: bool = DEFAULTS["full_batch"],  # type: ignore
+    num_workers: int = DEFAULTS["num_workers"],  # type: ignore
     wandb_project: Optional[str] = None
 ):
     if resample:
@@ -89,12 +143,26 @@ def fit_delivr(
         os.makedirs(output_dir)
 
     # Metadata dictionary that will be saved alongside the results.
-    meta = dict(locals())
+    # Only the (JSON serializable) hyperparameters are listed.
+    meta = {
+        "resample": resample,
+        "output_dir": output_dir,
+        "validation_proportion": validation_proportion,
+        "binary_outcome": binary_outcome,
+        "hidden": hidden,
+        "learning_rate": learning_rate,
+        "weight_decay": weight_decay,
+        "batch_size": batch_size,
+        "max_epochs": max_epochs,
+        "accelerator": accelerator,
+        "precision": precision,
+        "full_batch": full_batch,
+        "num_workers": num_workers,
+        "wandb_project": wandb_project,
+    }
     meta["model"] = "delivr"
     meta.update(dataset.exposure_descriptive_statistics())
     meta["covariable_labels"] = dataset.covariable_labels
-    del meta["dataset"]
-    del meta["stage2_dataset"]
 
     dataset.save_covariables(output_dir)
 
@@ -117,24 +185,25 @@ def fit_delivr(
     stg1_betas = fit_lin_exposure_model(train_dataset)
 
     outcome_val_loss = train_outcome_model(
-        train_dataset=stg2_train_dataset,
-        val_dataset=stg2_val_dataset,
+        train_dataset=FittedExposureDataset(stg2_train_dataset, stg1_betas),
+        val_dataset=FittedExposureDataset(stg2_val_dataset, stg1_betas),
         output_dir=output_dir,
-        betas=stg1_betas,
         hidden=hidden,
         learning_rate=learning_rate,
         weight_decay=weight_decay,
         batch_size=batch_size,
         max_epochs=max_epochs,
         accelerator=accelerator,
+        precision=precision,
+        full_batch=full_batch,
+        num_workers=num_workers,
         binary_outcome=binary_outcome,
         wandb_project=wandb_project
     )
 
     meta["outcome_val_loss"] = outcome_val_loss
 
-    with open(os.path.join(output_dir, "meta.json"), "wt") as f:
-        json.dump(meta, f)
+    write_json(meta, os.path.join(output_dir, "meta.json"))
 
     estimator = DeLIVREstimator.from_results(output_dir)
 
@@ -156,12 +225,12 @@ class OutcomeMLP(MLP):
     def __init__(
         self,
         input_size: int,
-        betas: torch.Tensor,
         hidden: Iterable[int],
         lr: float,
         weight_decay: float,
         binary_outcome: bool = False,
-        activations: Iterable[nn.Module] = [nn.GELU()]
+        activations: Iterable[nn.Module] = [nn.GELU()],
+        betas: Optional[torch.Tensor] = None
     ):
         if binary_outcome:
             loss = F.binary_cross_entropy_with_logits
@@ -177,22 +246,33 @@ class OutcomeMLP(MLP):
             weight_decay=weight_decay,
             loss=loss
         )
+        # The fitted exposure is precomputed by the FittedExposureDataset, so
+        # the stage 1 coefficients are not used. They are only accepted to
+        # load the checkpoints of older versions.
         self.betas = betas
 
-    def on_fit_start(self) -> None:
-        self.betas = self.betas.to(self.device)  # type: ignore
-        return super().on_fit_start()
+        # Reused storage for the [x, covars] MLP input (see mlp_input).
+        self._input_cat = CatBuffer()
+
+    def mlp_input(
+        self, x: torch.Tensor, covars: Optional[torch.Tensor]
+    ) -> torch.Tensor:
+        """Column concatenation of x and the covariables.
+
+        The result is written in a buffer that is reused across calls to
+        avoid allocating a new tensor at every forward pass.
+
+        """
+        return self._input_cat(x, covars)
 
     def x_to_y(
         self, x: torch.Tensor, covars: Optional[torch.Tensor]
     ) -> torch.Tensor:
-        return self.mlp(_cat(x, covars))
+        return self.mlp(self.mlp_input(x, covars))
 
     def _step(self, batch, batch_index, log_prefix):
-        _, y, ivs, covars = batch
-
-        # Get E[X|Z]
-        x_hat = _cat(ivs, covars) @ self.betas
+        # The batches contain E[X|Z] (see FittedExposureDataset).
+        x_hat, y, covars = batch
 
         # Get h_hat(x_hat)
         y_hat = self.x_to_y(x_hat, covars)
@@ -208,20 +288,23 @@ def train_outcome_model(
         train_dataset: Dataset,
         val_dataset: Dataset,
         output_dir: str,
-        betas: torch.Tensor,
         hidden: List[int],
         learning_rate: float,
         weight_decay: float,
         batch_size: int,
         max_epochs: int,
         accelerator: Optional[str] = None,
+        precision: str = "32-true",
+        full_batch: bool = False,
+        num_workers: int = 0,
+        persistent_workers: bool = True,
+        prefetch_factor: int = 4,
         binary_outcome: bool = False,
         wandb_project: Optional[str] = None
 ) -> float:
-    n_covars = train_dataset[0][3].numel()
+    n_covars = get_n_covars(train_dataset)
     model = OutcomeMLP(
         input_size=n_covars + 1,
-        betas=betas,
         hidden=hidden,
         lr=learning_rate,
         weight_decay=weight_decay,
@@ -238,6 +321,12 @@ def train_outcome_model(
         batch_size=batch_size,
         max_epochs=max_epochs,
         accelerator=accelerator,
+        precision=precision,
+        use_full_batch_training=full_batch,
+        pin_memory=accelerator == "gpu",
+        num_workers=num_workers,
+        persistent_workers=persistent_workers,
+        prefetch_factor=prefetch_factor,
         wandb_project=wandb_project
     )
 
@@ -247,9 +336,31 @@ class DeLIVREstimator(MREstimator):
         self,
         outcome_network: OutcomeMLP,
         meta: dict,
-        covars: Optional[torch.Tensor]
+        covars: Optional[torch.Tensor],
+        compile_network: bool = False,
+        quantize: bool = False
     ):
+        """The outcome MLP can be compiled (torch.compile) to fuse the
+        kernels used at inference, at the cost of a compilation on the first
+        call for every input shape.
+
+        It can also be quantized to int8 (dynamic quantization of the linear
+        layers) for faster inference on CPU. The original FP32 network is kept
+        in outcome_network.
+
+        """
         self.outcome_network = outcome_network
+        self._mlp: nn.Module = outcome_network.mlp
+        if quantize:
+            self._mlp = torch.ao.quantization.quantize_dynamic(
+                self._mlp, {nn.Linear}, dtype=torch.qint8
+            )
+
+        if compile_network:
+            self._mlp = torch.compile(  # type: ignore
+                self._mlp, dynamic=False
+            )
+
         super().__init__(meta, covars)
 
     def iv_reg_function(
@@ -257,18 +368,20 @@ class DeLIVREstimator(MREstimator):
         x: torch.Tensor,
         covars: Optional[torch.Tensor] = None
     ) -> torch.Tensor:
-        with torch.no_grad():
-            return self.outcome_network.x_to_y(x, covars)
+        with torch.inference_mode():
+            return self._mlp(self.outcome_network.mlp_input(x, covars))
 
     @classmethod
-    def from_results(cls, dir_name: str) -> "DeLIVREstimator":
+    def from_results(
+        cls,
+        dir_name: str,
+        compile_network: bool = False,
+        quantize: bool = False
+    ) -> "DeLIVREstimator":
         with open(os.path.join(dir_name, "meta.json"), "rt") as f:
             meta = json.load(f)
 
-        try:
-            covars = torch.load(os.path.join(dir_name, "covariables.pt"))
-        except FileNotFoundError:
-            covars = None
+        covars = IVDataset.load_covariables(dir_name)
 
         outcome_network = OutcomeMLP.load_from_checkpoint(
             os.path.join(dir_name, "outcome_network.ckpt"),
@@ -277,7 +390,7 @@ class DeLIVREstimator(MREstimator):
 
         outcome_network.eval()
 
-        return cls(outcome_network, meta, covars)
+        return cls(outcome_network, meta, covars, compile_network, quantize)
 
 
 def configure_argparse(parser) -> None:
@@ -305,6 +418,30 @@ def configure_argparse(parser) -> None:
         default=DEFAULTS["validation_proportion"],
     )
 
+    parser.add_argument(
+        "--full-batch",
+        action="store_true",
+        help="Train the outcome model on the full dataset at every step. "
+        "The data is copied to the accelerator once, which is faster if it "
+        "fits in memory. The batch size is ignored.",
+    )
+
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=DEFAULTS["num_workers"],
+        help="Number of worker processes used to load the training batches. "
+        "Workers are kept alive across epochs.",
+    )
+
+    parser.add_argument(
+        "--precision",
+        default=DEFAULTS["precision"],
+        help="Floating point precision used to train the outcome model (e.g. "
+        "32-true, 16-mixed, bf16-mixed). This will be passed to Pytorch "
+        "Lightning.",
+    )
+
     parser.add_argument(
         "--wandb-project",
         default=None,
@@ -54,9 +54,9 @@ import torch.nn.functional as F
 from torch.utils.data import DataLoader, Dataset, random_split
 
 from ..logging import warn
-from ..utils import default_validate_args
+from ..utils import default_validate_args, write_json
 from ..utils.conformal import OutcomeResidualPrediction
-from ..utils.data import IVDataset, IVDatasetWithGenotypes
+from ..utils.data import IVDataset, IVDatasetWithGenotypes, get_n_covars
 from ..utils.linear import ridge_fit_predict
 from ..utils.nn import build_mlp
 from ..utils.training import train_model
@@ -699,8 +699,7 @@ def fit_dfiv(
         conformal_net, _2sls_results["betas1"], _2sls_results["betas2"]
     )
 
-    with open(os.path.join(output_dir, "meta.json"), "wt") as f:
-        json.dump(meta, f)
+    write_json(meta, os.path.join(output_dir, "meta.json"))
 
     if wandb_project is not None:
         import wandb
@@ -730,7 +729,7 @@ def train_conformal_predictor(
 ):
     # We need to have a forward method that goes from x to y.
     n_exposures = train_dataset[0][0].numel()
-    n_covars = train_dataset[0][3].numel()
+    n_covars = get_n_covars(train_dataset)
 
     wrap = _ConformalStub(model, betas)
     resid_model = OutcomeResidualPrediction(
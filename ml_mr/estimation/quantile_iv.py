@@ -4,6 +4,7 @@ distribution.
 """
 
 import argparse
+import ast
 import json
 import os
 from typing import Iterable, List, Optional, Tuple, Any, Union, Type
@@ -12,7 +13,7 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader, Dataset, random_split
+from torch.utils.data import Dataset, random_split
 import pytorch_lightning as pl
 
 from ..logging import info
@@ -20,8 +21,10 @@ from ..utils import default_validate_args, parse_project_and_run_name
 from ..utils.models import MLP, OutcomeMLPBase
 from ..utils.quantiles import QuantileLossMulti
 from ..utils.training import train_model, resample_dataset
-from ..utils.data import IVDataset, IVDatasetWithGenotypes
-from ..utils import _cat
+from ..utils.data import (IVDataset, IVDatasetWithGenotypes, get_batch,
+                          get_n_covars)
+from ..utils import (CatBuffer, _cat, restore_float32_matmul_precision,
+                     write_json)
 from .core import MREstimator
 
 # Default values definitions.
@@ -47,7 +50,19 @@ DEFAULTS = {
     "validation_proportion": 0.2,
     "outcome_type": "continuous",
     "output_dir": "quantile_iv_estimate",
-    "activation": "GELU",
+    # The tanh approximation of GELU is cheaper to evaluate than the exact
+    # (erf) version.
+    "activation": "GELU:approximate=tanh",
+    # Resolved from the accelerator if None (worker processes on GPU).
+    "num_workers": None,
+    "compile_exposure_network": False,
+    # Mixed precision (e.g. 16-mixed) is opt-in.
+    "precision": "32-true",
+    # Left unchanged if None, "high" allows TF32 matmuls on recent GPUs.
+    "matmul_precision": None,
+    # Training datasets smaller than this (in bytes) are kept in memory on
+    # the accelerator and minibatches are sliced from the cached tensors.
+    "small_dataset_threshold": 2 ** 28,
 }
 # fmt: on
 
@@ -69,11 +84,11 @@ class ExposureQuantileMLP(MLP):
         # Previous implementation used:
         # (i + 1) / (n_quantiles + 1) for i in range(n_quantiles)]
         # However, it is more theoretically sound to use:
-        self.quantiles = torch.tensor([
+        quantiles = torch.tensor([
             (2 * k - 1) / (2 * n_quantiles) for k in range(1, n_quantiles + 1)]
         )
 
-        loss = QuantileLossMulti(self.quantiles)
+        loss = QuantileLossMulti(quantiles)
 
         super().__init__(
             input_size=input_size,
@@ -84,24 +99,30 @@ class ExposureQuantileMLP(MLP):
             activations=activations,
             lr=lr,
             weight_decay=weight_decay,
-            loss=loss
+            loss=loss,
+            _save_hyperparams=False
         )
 
-    def on_fit_start(self) -> None:
-        self.loss.quantiles = self.loss.quantiles.to(  # type: ignore
-            device=self.device
-        )
-        return super().on_fit_start()
+        # The loss (and its quantiles buffer) is rebuilt from n_quantiles, so
+        # it is not saved as a hyperparameter.
+        self.save_hyperparameters()
+
+        # Reused storage for the [ivs, covars] input in _step.
+        self._input_cat = CatBuffer()
+
+    @property
+    def quantiles(self) -> torch.Tensor:
+        return self.loss.quantiles  # type: ignore
 
     def _step(self, batch, batch_index, log_prefix):
         x, _, ivs, covars = batch
 
-        x_hat = self.forward(
-            torch.hstack([tens for tens in (ivs, covars) if tens.numel() > 0])
-        )
+        x_hat = self.forward(self._input_cat(ivs, covars))
 
         loss = self.loss(x_hat, x)
-        self.log(f"exposure_{log_prefix}_loss", loss)
+        self.log(
+            f"exposure_{log_prefix}_loss", loss, on_step=False, on_epoch=True
+        )
         return loss
 
 
@@ -120,11 +141,11 @@ class ExposureNMQN(MLP):
     ):
         """The model will predict q quantiles."""
         assert n_quantiles >= 3
-        self.quantiles = torch.tensor([
+        quantiles = torch.tensor([
             (2 * k - 1) / (2 * n_quantiles) for k in range(1, n_quantiles + 1)]
         )
 
-        loss = QuantileLossMulti(self.quantiles)
+        loss = QuantileLossMulti(quantiles)
         hidden = list(hidden)
         assert len(hidden) >= 2
 
@@ -145,22 +166,23 @@ class ExposureNMQN(MLP):
 
         self.save_hyperparameters()
         self.deltas = nn.Linear(hidden[-1] + 1, n_quantiles, bias=False)
+        self._betas_cache: Optional[Tuple[Any, torch.Tensor]] = None
 
-    def on_fit_start(self) -> None:
-        self.loss.quantiles = self.loss.quantiles.to(  # type: ignore
-            device=self.device
-        )
-        return super().on_fit_start()
+        # Reused storage for the [ivs, covars] input in _step.
+        self._input_cat = CatBuffer()
+
+    @property
+    def quantiles(self) -> torch.Tensor:
+        return self.loss.quantiles  # type: ignore
 
     def penalty(self):
         return self.l1_penalty_vec(self.deltas.weight)
 
     @staticmethod
     def l1_penalty_vec(d):
-        M = torch.sum(torch.max(torch.tensor(0), -d[1:, 1:]), dim=0)
-        d0_clipped = torch.clip(d[0, 1:], min=M)
-        penalty = torch.mean(torch.abs(d[0, 1:] - d0_clipped))
-        return penalty
+        M = torch.relu(-d[1:, 1:]).sum(dim=0)
+        d0 = d[0, 1:]
+        return (d0 - d0.clamp(min=M)).abs().mean()
 
     def forward(self, x):
         mlp_out = super().forward(x)
@@ -169,24 +191,40 @@ class ExposureNMQN(MLP):
             mlp_out
         ))
 
-        betas = torch.cumsum(self.deltas.weight, dim=1)
+        return mlp_out @ self.betas().T
+
+    def betas(self) -> torch.Tensor:
+        """Quantile coefficients (cumulative sum of the deltas).
+
+        When no gradient flows to the deltas (e.g. the frozen network used in
+        the outcome model training), the result is cached until the weights
+        are modified.
+
+        """
+        weight = self.deltas.weight
+        if torch.is_grad_enabled() and weight.requires_grad:
+            return torch.cumsum(weight, dim=1)
+
+        key = (weight.data_ptr(), weight._version)
+        if self._betas_cache is None or self._betas_cache[0] != key:
+            self._betas_cache = (key, torch.cumsum(weight.detach(), dim=1))
 
-        return mlp_out @ betas.T
+        return self._betas_cache[1]
 
     def _step(self, batch, batch_index, log_prefix):
         x, _, ivs, covars = batch
 
-        qhat = self.forward(
-            torch.hstack([tens for tens in (ivs, covars) if tens.numel() > 0])
-        )
+        qhat = self.forward(self._input_cat(ivs, covars))
 
         qloss = self.loss(qhat, x)
         pen = self.penalty()
         loss = qloss + self.hparams.pen_lambda * pen
 
-        self.log(f"exposure_{log_prefix}_qloss", qloss)
-        self.log(f"exposure_{log_prefix}_pen", pen)
-        self.log(f"exposure_{log_prefix}_loss", loss)
+        self.log_dict({
+            f"exposure_{log_prefix}_qloss": qloss,
+            f"exposure_{log_prefix}_pen": pen,
+            f"exposure_{log_prefix}_loss": loss,
+        }, on_step=False, on_epoch=True)
 
         return loss
 
@@ -219,26 +257,43 @@ class OutcomeMLP(OutcomeMLPBase):
             activations=activations
         )
 
+        # Reused storage for the [x_hat, covars] MLP input in forward.
+        self._input_cat = CatBuffer()
+
     def forward(  # type: ignore
         self,
         ivs: torch.Tensor,
         covars: Optional[torch.Tensor],
         taus: Optional[torch.Tensor] = None
     ):
-        """Forward pass throught the exposure and outcome models."""
+        """Forward pass throught the exposure and outcome models.
+
+        The outcome MLP is evaluated at every fitted exposure quantile and
+        the predictions are averaged. The exposure network is frozen and
+        evaluated under no_grad, so gradients don't flow into it.
+
+        """
         if self.hparams.sqr:  # type: ignore
             assert taus is not None, "Need quantile samples if SQR enabled."
 
-        x_hats = self.exposure_network(_cat(ivs, covars))
+        # The exposure network is frozen. This can't use inference mode
+        # because the fitted quantiles are saved for the outcome MLP backward.
+        with torch.no_grad():
+            x_hats = self.exposure_network(_cat(ivs, covars))
+
         n_q = x_hats.size(1)
         n = ivs.size(0)
 
-        y_hat = torch.zeros((n, 1), device=self.device)  # type: ignore
+        # Evaluate all the quantiles in a single pass by stacking them along
+        # the batch dimension (row i * n_q + j is quantile j of sample i).
+        if covars is not None:
+            covars = covars.repeat_interleave(n_q, dim=0)
 
-        for j in range(n_q):
-            y_hat += self.mlp(_cat(x_hats[:, [j]], covars)) / n_q
+        y_hats = self.mlp(
+            self._input_cat(x_hats.reshape(n * n_q, 1), covars)
+        )
 
-        return y_hat
+        return y_hats.view(n, n_q, -1).mean(dim=1)
 
 
 class QuantileIVEstimator(MREstimator):
@@ -251,23 +306,37 @@ class QuantileIVEstimator(MREstimator):
     ):
         self.exposure_network = exposure_network
         self.outcome_network = outcome_network
+
+        # Keep the covariables on the same device as the networks to avoid
+        # copies when marginalizing over them.
+        if covars is not None:
+            covars = covars.to(outcome_network.device)
+
         super().__init__(meta, covars)
 
     def iv_reg_function(
         self, x: torch.Tensor, covars: Optional[torch.Tensor] = None
     ) -> torch.Tensor:
-        with torch.no_grad():
+        with torch.inference_mode():
             return self.outcome_network.x_to_y(x, covars)
 
     @classmethod
-    def from_results(cls, dir_name: str) -> "QuantileIVEstimator":
+    def from_results(
+        cls,
+        dir_name: str,
+        compile_network: bool = False
+    ) -> "QuantileIVEstimator":
+        """Loads a fitted estimator.
+
+        If compile_network is True, the outcome MLP used by iv_reg_function is
+        compiled (torch.compile) which can speed up repeated evaluations at
+        the cost of a compilation on the first call.
+
+        """
         with open(os.path.join(dir_name, "meta.json"), "rt") as f:
             meta = json.load(f)
 
-        try:
-            covars = torch.load(os.path.join(dir_name, "covariables.pt"))
-        except FileNotFoundError:
-            covars = None
+        covars = IVDataset.load_covariables(dir_name)
 
         exposure_net_cls: Type[pl.LightningModule] = (
             ExposureNMQN if meta.get("nmqn", False)
@@ -287,6 +356,9 @@ class QuantileIVEstimator(MREstimator):
 
         outcome_network.eval()  # type: ignore
 
+        if compile_network:
+            outcome_network.mlp.compile()
+
         return cls(exposure_network, outcome_network, meta=meta, covars=covars)
 
 
@@ -315,6 +387,36 @@ def main(args: argparse.Namespace) -> None:
     )
 
 
+def parse_activation(activation: str) -> nn.Module:
+    """Instantiates an activation from its torch.nn class name.
+
+    Keyword arguments can be given after a colon, for example
+    "GELU:approximate=tanh" or "LeakyReLU:negative_slope=0.1". The activation
+    module is shared by all the layers of the networks.
+
+    """
+    name, _, args_str = activation.partition(":")
+    activation_cls = getattr(nn, name, None)
+    if activation_cls is None:
+        raise ValueError(
+            f"Requested activation: '{name}' is not a class in torch.nn."
+        )
+
+    # Values are parsed as Python literals (e.g. 1, 0.1, False), anything
+    # else is passed as a string.
+    kwargs: dict = {}
+    for arg in filter(None, args_str.split(",")):
+        key, _, value = arg.partition("=")
+        try:
+            kwargs[key.strip()] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            kwargs[key.strip()] = value.strip()
+
+    # We don't support parametrized activations with no default values, so
+    # this may fail.
+    return activation_cls(**kwargs)
+
+
 def train_exposure_model(
     n_quantiles: int,
     train_dataset: Dataset,
@@ -329,6 +431,12 @@ def train_exposure_model(
     add_input_batchnorm: bool,
     max_epochs: int,
     accelerator: Optional[str] = None,
+    precision: str = "32-true",
+    num_workers: int = 0,
+    pin_memory: Optional[bool] = None,
+    persistent_workers: bool = True,
+    prefetch_factor: int = 2,
+    small_dataset_threshold: Optional[int] = DEFAULTS["small_dataset_threshold"],  # type: ignore # noqa: E501
     wandb_project: Optional[str] = None,
     nmqn_penalty_lambda: Optional[float] = None
 ) -> Tuple[Type[QIVExposureNetType], float]:
@@ -362,6 +470,14 @@ def train_exposure_model(
         batch_size=batch_size,
         max_epochs=max_epochs,
         accelerator=accelerator,
+        precision=precision,
+        pin_memory=(
+            accelerator == "gpu" if pin_memory is None else pin_memory
+        ),
+        num_workers=num_workers,
+        persistent_workers=persistent_workers,
+        prefetch_factor=prefetch_factor,
+        small_dataset_threshold=small_dataset_threshold,
         wandb_project=wandb_project
     )
 
@@ -379,11 +495,17 @@ def train_outcome_model(
     add_input_batchnorm: bool,
     max_epochs: int,
     accelerator: Optional[str] = None,
+    precision: str = "32-true",
+    num_workers: int = 0,
+    pin_memory: Optional[bool] = None,
+    persistent_workers: bool = True,
+    prefetch_factor: int = 2,
+    small_dataset_threshold: Optional[int] = DEFAULTS["small_dataset_threshold"],  # type: ignore # noqa: E501
     binary_outcome: bool = False,
     wandb_project: Optional[str] = None
 ) -> Tuple[Any, float]:
     info("Training outcome model.")
-    n_covars = train_dataset[0][3].numel()
+    n_covars = get_n_covars(train_dataset)
 
     model = OutcomeMLP(
         exposure_network=exposure_network,
@@ -408,10 +530,19 @@ def train_outcome_model(
         batch_size=batch_size,
         max_epochs=max_epochs,
         accelerator=accelerator,
+        precision=precision,
+        pin_memory=(
+            accelerator == "gpu" if pin_memory is None else pin_memory
+        ),
+        num_workers=num_workers,
+        persistent_workers=persistent_workers,
+        prefetch_factor=prefetch_factor,
+        small_dataset_threshold=small_dataset_threshold,
         wandb_project=wandb_project,
     )
 
 
+@restore_float32_matmul_precision()
 def fit_quantile_iv(
     dataset: IVDataset,
     n_quantiles: int = DEFAULTS["n_quantiles"],  # type: ignore
@@ -437,6 +568,11 @@ def fit_quantile_iv(
     outcome_add_input_batchnorm: bool = DEFAULTS["outcome_add_input_batchnorm"],  # type: ignore # noqa: E501
     activation: str = DEFAULTS["activation"],  # type: ignore
     accelerator: str = DEFAULTS["accelerator"],  # type: ignore
+    precision: str = DEFAULTS["precision"],  # type: ignore
+    matmul_precision: Optional[str] = DEFAULTS["matmul_precision"],  # type: ignore # noqa: E501
+    num_workers: Optional[int] = DEFAULTS["num_workers"],  # type: ignore
+    small_dataset_threshold: Optional[int] = DEFAULTS["small_dataset_threshold"],  # type: ignore # noqa: E501
+    compile_exposure_network: bool = DEFAULTS["compile_exposure_network"],  # type: ignore # noqa: E501
     wandb_project: Optional[str] = None,
 ) -> QuantileIVEstimator:
     if resample:
@@ -444,17 +580,18 @@ def fit_quantile_iv(
         if stage2_dataset is not None:
             stage2_dataset = resample_dataset(stage2_dataset)  # type: ignore
 
+    # On GPU, worker processes prepare the (pinned) batches while the model
+    # trains. Datasets small enough to be kept on the device don't use them.
+    if num_workers is None:
+        num_workers = 2 if accelerator == "gpu" else 0
+
     activation_str = activation
-    activation_cls = getattr(nn, activation_str)
-    if activation_str is None:
-        raise ValueError(
-            f"Requested activation: '{activation_str}' is not a class in "
-            f"torch.nn."
-        )
-    else:
-        # Attempt to instantiate. We don't support parametrized activations
-        # with no default values, so this may fail.
-        activation_inst = activation_cls()
+    activation_inst = parse_activation(activation_str)
+
+    # The float32 matmul precision is a global torch setting, it is restored
+    # once the model is fitted (see the decorator).
+    if matmul_precision is not None:
+        torch.set_float32_matmul_precision(matmul_precision)
 
     # Create output directory if needed.
     if not os.path.isdir(output_dir):
@@ -468,7 +605,6 @@ def fit_quantile_iv(
     meta["activation"] = activation_str  # Serialize str not class.
     del meta["dataset"]  # We don't serialize the dataset.
     del meta["stage2_dataset"]
-    del meta["activation_cls"]
     del meta["activation_inst"]
 
     covars = dataset.save_covariables(output_dir)
@@ -504,6 +640,9 @@ def fit_quantile_iv(
         add_input_batchnorm=exposure_add_input_batchnorm,
         max_epochs=exposure_max_epochs,
         accelerator=accelerator,
+        precision=precision,
+        num_workers=num_workers,
+        small_dataset_threshold=small_dataset_threshold,
         wandb_project=wandb_project,
         nmqn_penalty_lambda=nmqn_penalty_lambda if nmqn else None
     )
@@ -512,10 +651,16 @@ def fit_quantile_iv(
 
     exposure_network = exposure_class.load_from_checkpoint(
         os.path.join(output_dir, "exposure_network.ckpt"),
-    ).to(torch.device("cpu")).eval()  # type: ignore
+        map_location=torch.device("cpu")
+    ).eval()  # type: ignore
 
     exposure_network.freeze()
 
+    # The frozen exposure network is evaluated at every step of the outcome
+    # model training, compiling it in place keeps the state dict keys.
+    if compile_exposure_network:
+        exposure_network.compile()
+
     if not fast:
         plot_exposure_model(
             exposure_network,
@@ -538,6 +683,9 @@ def fit_quantile_iv(
         add_input_batchnorm=outcome_add_input_batchnorm,
         max_epochs=outcome_max_epochs,
         accelerator=accelerator,
+        precision=precision,
+        num_workers=num_workers,
+        small_dataset_threshold=small_dataset_threshold,
         binary_outcome=binary_outcome,
         wandb_project=wandb_project
     )
@@ -547,7 +695,8 @@ def fit_quantile_iv(
     outcome_network = outcome_class.load_from_checkpoint(
         os.path.join(output_dir, "outcome_network.ckpt"),
         exposure_network=exposure_network,
-    ).eval().to(torch.device("cpu"))  # type: ignore
+        map_location=torch.device("cpu")
+    ).eval()  # type: ignore
 
     # Training the 2nd stage model copies the exposure net to the GPU.
     # Here, we ensure they're on the same device.
@@ -559,8 +708,7 @@ def fit_quantile_iv(
 
     # Save the metadata, estimator statistics and log artifact to WandB if
     # required.
-    with open(os.path.join(output_dir, "meta.json"), "wt") as f:
-        json.dump(meta, f)
+    write_json(meta, os.path.join(output_dir, "meta.json"))
 
     if not fast:
         save_estimator_statistics(
@@ -583,53 +731,77 @@ def fit_quantile_iv(
     return estimator
 
 
-@torch.no_grad()
-def plot_exposure_model(
-    exposure_network: QIVExposureNetType,
-    val_dataset: Dataset,
-    output_filename: str
-):
-    assert hasattr(val_dataset, "__len__")
-    dataloader = DataLoader(val_dataset, batch_size=len(val_dataset))
-    true_x, _, ivs, covariables = next(iter(dataloader))
+def _identity_line(ax=None, ls='--', *args, **kwargs):
+    # see: https://stackoverflow.com/q/22104256/3986320
+    ax = ax or plt.gca()
+    identity, = ax.plot([], [], ls=ls, *args, **kwargs)
 
-    input = torch.hstack(
-        [tens for tens in (ivs, covariables) if tens.numel() > 0]
-    )
+    def callback(axes):
+        low_x, high_x = ax.get_xlim()
+        low_y, high_y = ax.get_ylim()
+        low = min(low_x, low_y)
+        high = max(high_x, high_y)
+        identity.set_data([low, high], [low, high])
 
-    predicted_quantiles = exposure_network(input)
+    callback(ax)
+    ax.callbacks.connect('xlim_changed', callback)
+    ax.callbacks.connect('ylim_changed', callback)
+    return ax
 
-    def identity_line(ax=None, ls='--', *args, **kwargs):
-        # see: https://stackoverflow.com/q/22104256/3986320
-        ax = ax or plt.gca()
-        identity, = ax.plot([], [], ls=ls, *args, **kwargs)
 
-        def callback(axes):
-            low_x, high_x = ax.get_xlim()
-            low_y, high_y = ax.get_ylim()
-            low = min(low_x, low_y)
-            high = max(high_x, high_y)
-            identity.set_data([low, high], [low, high])
+@torch.inference_mode()
+def plot_exposure_model(
+    exposure_network: QIVExposureNetType,
+    val_dataset: Dataset,
+    output_filename: str,
+    max_points: int = 5000,
+    batch_size: int = 4096
+):
+    """Plots the predicted exposure quantiles against the observed exposure.
 
-        callback(ax)
-        ax.callbacks.connect('xlim_changed', callback)
-        ax.callbacks.connect('ylim_changed', callback)
-        return ax
+    At most max_points individuals (sampled at random) are used to keep the
+    memory usage, rendering time and file size bounded for large validation
+    sets. The predictions are made in batches of batch_size.
 
-    for q in range(predicted_quantiles.size(1)):
-        plt.scatter(
+    """
+    assert hasattr(val_dataset, "__len__")
+    n = len(val_dataset)
+    if n > max_points:
+        # A local generator leaves the global RNG state, and therefore the
+        # training of the outcome model, unaffected by the plot.
+        generator = torch.Generator().manual_seed(0)
+        indices = torch.randperm(n, generator=generator)[:max_points]
+    else:
+        indices = torch.arange(n)
+
+    true_x_batches = []
+    predicted_quantiles_batches = []
+    for batch_indices in torch.split(indices, batch_size):
+        x, _, ivs, covariables = get_batch(val_dataset, batch_indices)
+        input = _cat(ivs, covariables).to(exposure_network.device)
+        true_x_batches.append(x)
+        predicted_quantiles_batches.append(exposure_network(input).cpu())
+
+    true_x = torch.cat(true_x_batches).numpy()
+    predicted_quantiles = torch.cat(predicted_quantiles_batches).numpy()
+    quantiles = exposure_network.quantiles.tolist()
+
+    # plot with a marker is much faster than scatter for many points.
+    for q, tau in enumerate(quantiles):
+        plt.plot(
             true_x,
-            predicted_quantiles[:, q].detach().numpy(),
-            label="q={:.2f}".format(exposure_network.quantiles[q].item()),
-            s=1,
+            predicted_quantiles[:, q],
+            ".",
+            label="q={:.2f}".format(tau),
+            markersize=1,
             alpha=0.2,
         )
-    identity_line(lw=1, color="black")
+    _identity_line(lw=1, color="black")
     plt.xlabel("Observed X")
     plt.ylabel("Predicted X (quantiles)")
     plt.legend()
 
-    plt.savefig(output_filename, dpi=400)
+    plt.savefig(output_filename, dpi=150)
     plt.clf()
     plt.close()
 
@@ -639,10 +811,17 @@ def save_estimator_statistics(
     domain: Tuple[float, float],
     output_prefix: str = "causal_estimates",
 ):
-    # Save the causal effect at over the domain.
-    xs = torch.linspace(domain[0], domain[1], 500).reshape(-1, 1)
-    ys = estimator.avg_iv_reg_function(xs).reshape(-1)
-    df = pd.DataFrame({"x": xs.reshape(-1), "y_do_x": ys})
+    # Save the causal effect at over the domain. The grid is created on the
+    # device of the networks and evaluated in a single batch.
+    xs = torch.linspace(
+        domain[0], domain[1], 500,
+        device=estimator.outcome_network.device
+    ).reshape(-1, 1)
+    ys = estimator.avg_iv_reg_function(xs)
+
+    # Single copy of the results to the host.
+    results = torch.hstack((xs, ys.reshape(-1, 1))).cpu().numpy()
+    df = pd.DataFrame({"x": results[:, 0], "y_do_x": results[:, 1]})
 
     plt.figure()
     plt.scatter(df["x"], df["y_do_x"], label="Estimated IV regression", s=3)
@@ -715,6 +894,50 @@ def configure_argparse(parser) -> None:
         "will be passed to Pytorch Lightning.",
     )
 
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=DEFAULTS["num_workers"],
+        help="Number of worker processes used to load the training batches. "
+        "Workers are kept alive across epochs. Defaults to 2 on GPU and 0 "
+        "otherwise.",
+    )
+
+    parser.add_argument(
+        "--small-dataset-threshold",
+        type=int,
+        default=DEFAULTS["small_dataset_threshold"],
+        help="Training datasets smaller than this size (in bytes) are copied "
+        "to the accelerator once and the minibatches are sliced in place, "
+        "without the DataLoader. Use 0 to disable.",
+    )
+
+    parser.add_argument(
+        "--precision",
+        default=DEFAULTS["precision"],
+        help="Floating point precision used to train the exposure and outcome "
+        "models (e.g. 32-true, 16-mixed, bf16-mixed). This will be passed to "
+        "Pytorch Lightning.",
+    )
+
+    parser.add_argument(
+        "--matmul-precision",
+        default=DEFAULTS["matmul_precision"],
+        choices=["highest", "high", "medium"],
+        help="Internal precision of float32 matrix multiplications (see "
+        "torch.set_float32_matmul_precision). The setting is left unchanged "
+        "by default, high allows TF32 on recent GPUs.",
+    )
+
+    parser.add_argument(
+        "--compile",
+        dest="compile_exposure_network",
+        action="store_true",
+        help="Compile (torch.compile) the exposure network once it is trained "
+        "to speed up the outcome model training. This mostly helps with large "
+        "networks on GPU.",
+    )
+
     parser.add_argument(
         "--resample",
         help="Resample with replacement to do bootstrapping.",
@@ -735,7 +958,9 @@ def configure_argparse(parser) -> None:
         "--activation",
         default=DEFAULTS["activation"],
         type=str,
-        help="Activation function (name should be a valid class in torch.nn)",
+        help="Activation function (name should be a valid class in torch.nn). "
+        "Keyword arguments can be provided after a colon (e.g. "
+        "GELU:approximate=tanh).",
     )
 
     MLP.add_mlp_arguments(
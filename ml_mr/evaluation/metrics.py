@@ -1,20 +1,68 @@
-from typing import Callable, Tuple, Optional
+from typing import Callable, Tuple, Optional, Iterable, List
 
 import torch
 import torch.nn.functional as F
 
-from ..estimation import MREstimator, MREstimatorWithUncertainty
+from ..estimation import (
+    MREstimator, MREstimatorWithUncertainty, EnsembleMREstimator
+)
+
+
+def _estimator_device(estimator: MREstimator) -> torch.device:
+    """Device of the estimator's network or bound covariables.
+
+    The evaluation grids are created on this device to avoid copying them
+    from the CPU at every metric computation.
+
+    """
+    network = getattr(estimator, "outcome_network", None)
+    if isinstance(network, torch.nn.Module):
+        for param in network.parameters():
+            return param.device
+
+    covars = getattr(estimator, "covars", None)
+    if isinstance(covars, torch.Tensor):
+        return covars.device
+
+    return torch.device("cpu")
+
+
+def _make_grid(
+    estimator: MREstimator,
+    domain: Tuple[float, float],
+    n_points: int
+) -> torch.Tensor:
+    return torch.linspace(
+        domain[0], domain[1], n_points, device=_estimator_device(estimator)
+    ).reshape(-1, 1)
+
+
+def _get_xs(
+    estimator: MREstimator,
+    xs: Optional[torch.Tensor],
+    domain: Optional[Tuple[float, float]],
+    n_points: int
+) -> torch.Tensor:
+    """Returns the provided evaluation points or a grid over the domain."""
+    if xs is not None:
+        return xs.reshape(-1, 1)
+
+    if domain is None:
+        raise ValueError("Either the domain or xs need to be provided.")
+
+    return _make_grid(estimator, domain, n_points)
 
 
 def mse(
     estimator: MREstimator,
     true_function: Callable[[torch.Tensor], torch.Tensor],
-    domain: Tuple[float, float],
+    domain: Optional[Tuple[float, float]] = None,
     covars: Optional[torch.Tensor] = None,
     low_memory: bool = False,
-    n_points: int = 2000
+    n_points: int = 2000,
+    xs: Optional[torch.Tensor] = None
 ) -> float:
-    xs = torch.linspace(domain[0], domain[1], n_points).reshape(-1, 1)
+    xs = _get_xs(estimator, xs, domain, n_points)
     y_hat = estimator.avg_iv_reg_function(
         xs, covars=covars, low_memory=low_memory
     )
@@ -30,12 +78,13 @@ def mse(
 def mean_coverage(
     estimator: MREstimatorWithUncertainty,
     true_function: Callable[[torch.Tensor], torch.Tensor],
-    domain: Tuple[float, float],
+    domain: Optional[Tuple[float, float]] = None,
     covars: Optional[torch.Tensor] = None,
-    n_points: int = 2000
+    n_points: int = 2000,
+    xs: Optional[torch.Tensor] = None
 ) -> float:
     assert isinstance(estimator, MREstimatorWithUncertainty)
-    xs = torch.linspace(domain[0], domain[1], n_points).reshape(-1, 1)
+    xs = _get_xs(estimator, xs, domain, n_points)
     pred = estimator.avg_iv_reg_function(xs, covars)
 
     true_y = true_function(xs)
@@ -49,12 +98,13 @@ def mean_coverage(
 
 def mean_prediction_interval_absolute_width(
     estimator: MREstimatorWithUncertainty,
-    domain: Tuple[float, float],
+    domain: Optional[Tuple[float, float]] = None,
     covars: Optional[torch.Tensor] = None,
     alpha: float = 0.1,
     n_points: int = 2000,
+    xs: Optional[torch.Tensor] = None
 ) -> float:
-    xs = torch.linspace(domain[0], domain[1], n_points).reshape(-1, 1)
+    xs = _get_xs(estimator, xs, domain, n_points)
 
     y_hat = estimator.iv_reg_function(
         xs, covars=covars, alpha=alpha
@@ -62,4 +112,44 @@ def mean_prediction_interval_absolute_width(
 
     y_low = y_hat[:, :, 0]
     y_high = y_hat[:, :, 2]
-    return torch.mean(torch.abs(y_low - y_high)).item()
+    return (y_high - y_low).abs_().mean().item()
+
+
+def mean_prediction_interval_absolute_widths(
+    estimator: MREstimatorWithUncertainty,
+    alphas: Iterable[float],
+    domain: Optional[Tuple[float, float]] = None,
+    covars: Optional[torch.Tensor] = None,
+    n_points: int = 2000,
+    xs: Optional[torch.Tensor] = None
+) -> List[float]:
+    """Mean prediction interval widths for a grid of alpha levels.
+
+    The ensemble members are only evaluated once and the intervals for all
+    the alphas are computed from the same predictions. Other estimators are
+    evaluated once per alpha on the same points.
+
+    """
+    xs = _get_xs(estimator, xs, domain, n_points)
+    alphas = list(alphas)
+
+    if not isinstance(estimator, EnsembleMREstimator):
+        return [
+            mean_prediction_interval_absolute_width(
+                estimator, covars=covars, alpha=alpha, xs=xs
+            )
+            for alpha in alphas
+        ]
+
+    combined = estimator.iv_reg_function(xs, covars=covars, reduce=False)
+    alphas_tens = torch.tensor(
+        alphas, dtype=combined.dtype, device=combined.device
+    )
+
+    bounds = torch.quantile(
+        combined, torch.cat((alphas_tens / 2, 1 - alphas_tens / 2)), dim=1
+    )
+
+    n_alphas = len(alphas)
+    return (bounds[n_alphas:] - bounds[:n_alphas]).abs_().mean(dim=1)\
+        .tolist()
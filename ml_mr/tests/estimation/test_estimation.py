@@ -1,6 +1,15 @@
+import pandas as pd
+import pytest
 import torch
 from numpy.testing import assert_array_equal
 
+from ...estimation.delivr import FittedExposureDataset, fit_lin_exposure_model
+from ...estimation.quantile_iv import (
+    ExposureNMQN, ExposureQuantileMLP, OutcomeMLP, parse_activation
+)
+from ...utils import _cat
+from ...utils.data import IVDataset
+
 from .fixtures import *  # noqa: F401, F403
 
 
@@ -89,3 +98,104 @@ def test_avg_iv_reg_fct_unc_lowmem(mr_estimator_covar_itx_with_unc):
     )
 
     assert torch.all(y_cv == expected)
+
+
+def test_cubic_interpolation(mr_estimator_identity_ignore_covars):
+    from scipy.interpolate import interp1d
+
+    torch.manual_seed(0)
+    x = torch.sort(torch.rand(20) * 10).values.to(torch.float64)
+    y = torch.sin(x)
+
+    interpolator = mr_estimator_identity_ignore_covars.interpolate(x, y)
+
+    x_new = torch.linspace(x[0], x[-1], 100, dtype=torch.float64)
+    expected = interp1d(x.numpy(), y.numpy(), kind="cubic")(x_new.numpy())
+
+    assert torch.allclose(
+        interpolator(x_new), torch.from_numpy(expected), atol=1e-8
+    )
+
+
+def test_parse_activation():
+    assert parse_activation("GELU:approximate=tanh").approximate == "tanh"
+    assert parse_activation("ELU:inplace=False").inplace is False
+    assert parse_activation("Softmax:dim=1").dim == 1
+    assert parse_activation("LeakyReLU:negative_slope=0.1")\
+        .negative_slope == 0.1
+
+
+@pytest.mark.parametrize("covariable_cols", [["c1", "c2"], []])
+def test_delivr_fitted_exposure_dataset(covariable_cols):
+    torch.manual_seed(0)
+    df = pd.DataFrame(
+        torch.randn(200, 6).numpy(),
+        columns=["x", "y", "z1", "z2", "c1", "c2"]
+    )
+    dataset = IVDataset.from_dataframe(
+        df, "x", "y", ["z1", "z2"], covariable_cols
+    )
+    betas = fit_lin_exposure_model(dataset)
+    fitted = FittedExposureDataset(dataset, betas)
+
+    assert fitted.n_covars() == len(covariable_cols)
+    assert len(fitted) == len(dataset)
+
+    expected = _cat(dataset.ivs, dataset.covariables) @ betas
+    assert torch.allclose(fitted.x_hat, expected, atol=1e-6)
+
+    x_hat, y, covars = fitted[3]
+    assert torch.equal(y, dataset.outcome[3])
+    assert torch.equal(covars, dataset.covariables[3])
+
+
+@pytest.mark.parametrize("exposure_class", [ExposureQuantileMLP, ExposureNMQN])
+def test_quantile_iv_outcome_forward(exposure_class):
+    torch.manual_seed(0)
+    exposure_network = exposure_class(
+        n_quantiles=5, input_size=5, hidden=[8, 8], lr=1e-3
+    ).eval()
+    outcome_network = OutcomeMLP(
+        exposure_network, input_size=3, hidden=[8], lr=1e-3
+    )
+
+    ivs = torch.randn(20, 3)
+    covars = torch.randn(20, 2)
+    y_hat = outcome_network(ivs, covars)
+
+    # Explicit loop over the quantiles.
+    x_hats = exposure_network(torch.hstack((ivs, covars)))
+    expected = torch.stack([
+        outcome_network.mlp(torch.hstack((x_hats[:, [j]], covars)))
+        for j in range(x_hats.size(1))
+    ]).mean(dim=0)
+
+    assert torch.allclose(y_hat, expected, atol=1e-6)
+
+    # The exposure network doesn't receive gradients.
+    y_hat.sum().backward()
+    assert all(p.grad is None for p in exposure_network.parameters())
+    assert all(p.grad is not None for p in outcome_network.mlp.parameters())
+
+
+def test_nmqn_betas_cache():
+    torch.manual_seed(0)
+    net = ExposureNMQN(n_quantiles=5, input_size=3, hidden=[8, 8], lr=1e-3)
+
+    with torch.no_grad():
+        betas = net.betas().clone()
+        assert net.betas() is net.betas()
+
+    # In-place update of the deltas by the optimizer.
+    optimizer = torch.optim.SGD(net.parameters(), lr=0.1)
+    x = torch.randn(20, 1)
+    net.loss(net(torch.randn(20, 3)), x).backward()
+    optimizer.step()
+
+    with torch.no_grad():
+        new_betas = net.betas()
+
+    assert not torch.allclose(betas, new_betas)
+    assert torch.allclose(
+        new_betas, torch.cumsum(net.deltas.weight.detach(), dim=1)
+    )
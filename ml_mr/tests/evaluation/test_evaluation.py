@@ -1,2 +1,46 @@
+import torch
+
+from ...estimation import MREstimator, EnsembleMREstimator
+from ...evaluation.metrics import (
+    mse,
+    mean_prediction_interval_absolute_width,
+    mean_prediction_interval_absolute_widths
+)
+
+
 def test_mse():
     assert True
+
+
+class _ShiftedLinearEstimator(MREstimator):
+    def __init__(self, shift: float):
+        super().__init__({}, None)
+        self.shift = shift
+
+    def iv_reg_function(self, x, covars=None):
+        return 2 * x + self.shift
+
+
+def test_mse_xs():
+    estimator = _ShiftedLinearEstimator(1)
+    xs = torch.linspace(0, 1, 10).reshape(-1, 1)
+
+    assert mse(estimator, lambda x: 2 * x, xs=xs) == 1
+    assert mse(estimator, lambda x: 2 * x, (0, 1)) == 1
+
+
+def test_mean_prediction_interval_absolute_widths():
+    estimator = EnsembleMREstimator(
+        *[_ShiftedLinearEstimator(i) for i in range(10)]
+    )
+    alphas = [0.05, 0.1, 0.5]
+
+    widths = mean_prediction_interval_absolute_widths(
+        estimator, alphas, (0, 1)
+    )
+
+    for width, alpha in zip(widths, alphas):
+        expected = mean_prediction_interval_absolute_width(
+            estimator, (0, 1), alpha=alpha
+        )
+        assert abs(width - expected) < 1e-5
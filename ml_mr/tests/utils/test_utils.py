@@ -1,8 +1,19 @@
+import json
+import math
+
+import pytest
 import torch
-from torch.utils.data import DataLoader
+from torch.utils.data import (BatchSampler, DataLoader, SequentialSampler,
+                              random_split)
 import pandas as pd
 
+from ...utils import (CatBuffer, restore_float32_matmul_precision,
+                      write_json)
+from ...utils.conformal import estimate_q_hat, OutcomeResidualPrediction
 from ...utils.training import resample_dataset
+from ...utils.linear import ridge_regression, _solve_normal_equations
+from ...utils.data import (get_n_covars, get_batch, InMemoryDataLoader,
+                           supports_batched_indexing)
 
 from .fixtures import *  # noqa: F401, F403
 
@@ -31,3 +42,166 @@ def test_resample_df(iv_dataset_range):
         FRAMES_EQ = False
 
     assert not FRAMES_EQ
+
+
+def test_batched_indexing(iv_dataset_range):
+    train, _ = random_split(iv_dataset_range, [0.8, 0.2])
+    assert supports_batched_indexing(train)
+    assert not supports_batched_indexing(resample_dataset(iv_dataset_range))
+
+    dl = DataLoader(
+        train, batch_size=None,
+        sampler=BatchSampler(SequentialSampler(train), 64, drop_last=False)
+    )
+    expected_dl = DataLoader(train, batch_size=64)
+
+    for batch, expected in zip(dl, expected_dl):
+        for tens, expected_tens in zip(batch, expected):
+            assert torch.equal(tens, expected_tens)
+
+
+def test_resample_getitems(iv_dataset_range):
+    bs = resample_dataset(iv_dataset_range)
+    x, *_ = next(iter(DataLoader(bs, batch_size=len(bs))))
+    x_expected = torch.vstack([bs[i][0] for i in range(len(bs))])
+
+    assert torch.equal(x, x_expected)
+
+
+def test_n_covars(iv_dataset_range):
+    train, _ = random_split(iv_dataset_range, [0.8, 0.2])
+    assert iv_dataset_range.n_covars() == 2
+    assert get_n_covars(train) == 2
+
+
+def test_get_batch_subset(iv_dataset_range):
+    train, _ = random_split(iv_dataset_range, [0.8, 0.2])
+    indices = torch.tensor([3, 0, 10])
+
+    expected = next(iter(DataLoader(torch.utils.data.Subset(
+        train, indices.tolist()
+    ), batch_size=3)))
+
+    for tens, expected_tens in zip(get_batch(train, indices), expected):
+        assert torch.equal(tens, expected_tens)
+
+
+def test_in_memory_dataloader(iv_dataset_range):
+    dl = InMemoryDataLoader(iv_dataset_range, batch_size=300, shuffle=True)
+    batches = list(dl)
+
+    assert len(dl) == len(batches) == 4
+    assert [x.size(0) for x, _, _, _ in batches] == [300, 300, 300, 100]
+
+    x = torch.cat([x for x, _, _, _ in batches]).flatten()
+    assert torch.equal(torch.sort(x).values, torch.arange(1000).to(x.dtype))
+
+
+def test_ridge_regression_ols():
+    torch.manual_seed(0)
+    x = torch.randn(100, 3, dtype=torch.float64)
+    y = x @ torch.tensor([[1.0], [-2.0], [0.5]], dtype=torch.float64)
+
+    betas = ridge_regression(x, y, alpha=0)
+    assert torch.allclose(betas, torch.linalg.solve(x.T @ x, x.T @ y))
+
+
+def test_ridge_regression_grad():
+    torch.manual_seed(0)
+    x = torch.randn(15_000, 33, requires_grad=True)
+    y = torch.randn(15_000, 1)
+
+    betas = ridge_regression(x, y, alpha=0.1)
+    betas.sum().backward()
+
+    x64 = x.detach().double().requires_grad_()
+    L = x64.T @ x64 + 0.1 * torch.eye(33, dtype=torch.float64)
+    expected = torch.linalg.solve(L, x64.T @ y.double())
+    expected.sum().backward()
+
+    assert torch.allclose(betas.double(), expected, atol=1e-5)
+    assert torch.allclose(x.grad.double(), x64.grad, atol=1e-6)
+
+
+def test_solve_normal_equations_rank_deficient():
+    torch.manual_seed(0)
+    x = torch.randn(100, 2, dtype=torch.float64)
+    x = torch.hstack((x, x[:, [0]]))  # Collinear column.
+    y = x @ torch.tensor([[1.0], [2.0], [0.0]], dtype=torch.float64)
+
+    betas = _solve_normal_equations(x.T @ x, x.T @ y)
+    assert torch.allclose(x @ betas, y)
+
+
+def test_cat_buffer():
+    cat = CatBuffer()
+    a, b = torch.randn(10, 2), torch.randn(10, 3)
+
+    out = cat(a, b)
+    assert torch.equal(out, torch.hstack((a, b)))
+
+    # Smaller batches reuse the storage.
+    out2 = cat(a[:4], b[:4])
+    assert out2.data_ptr() == out.data_ptr()
+    assert torch.equal(out2, torch.hstack((a[:4], b[:4])))
+
+    assert cat(a, None) is a
+
+
+def test_estimate_q_hat():
+    scores = torch.arange(1, 20, dtype=torch.float32)[torch.randperm(19)]
+
+    # ceil((19 + 1) * 0.9) = 18th smallest score.
+    assert estimate_q_hat(scores.reshape(-1, 1), alpha=0.1) == 18
+
+    # The calibration set is too small for the requested coverage.
+    with pytest.raises(ValueError):
+        estimate_q_hat(scores[:5], alpha=0.1)
+
+
+def test_restore_float32_matmul_precision():
+    previous = torch.get_float32_matmul_precision()
+
+    @restore_float32_matmul_precision()
+    def fit():
+        torch.set_float32_matmul_precision("medium")
+        raise RuntimeError()
+
+    with pytest.raises(RuntimeError):
+        fit()
+
+    assert torch.get_float32_matmul_precision() == previous
+
+
+def test_residual_prediction_interval():
+    class Wrapped(torch.nn.Module):
+        def x_to_y(self, x, covars=None):
+            return 3 * x
+
+    model = OutcomeResidualPrediction(3, Wrapped())  # type: ignore
+    model.q_hat = torch.tensor(1.5, requires_grad=True)
+
+    x = torch.randn(8, 1, requires_grad=True)
+    covars = torch.randn(8, 2)
+    pred = model.x_to_y(x, covars)
+
+    with torch.no_grad():
+        margin = model(x, covars) * 1.5
+
+    y = 3 * x.detach()
+    assert torch.allclose(pred, torch.hstack((y - margin, y, y + margin)))
+
+
+def test_write_json(tmp_path):
+    meta = {"outcome_val_loss": float("nan"), "hidden": [64, 32]}
+    filename = str(tmp_path / "meta.json")
+    write_json(meta, filename)
+
+    with open(filename) as f:
+        assert f.read() == json.dumps(meta)
+
+    with open(filename) as f:
+        loaded = json.load(f)
+
+    assert math.isnan(loaded["outcome_val_loss"])
+    assert loaded["hidden"] == [64, 32]
@@ -1,7 +1,9 @@
 # flake8: noqa
 import sys
+import json
 import argparse
-from typing import Tuple, Optional
+import contextlib
+from typing import Any, Tuple, Optional
 
 import torch
 
@@ -9,11 +11,91 @@ from ..logging import critical
 
 
 def _cat(*tensors) -> torch.Tensor:
-    """Simple column concatenation of tensors with null checking."""
-    return torch.hstack(
-        [tens for tens in tensors if tens is not None and tens.numel() > 0]
+    """Simple column concatenation of tensors with null checking.
+
+    The result is always contiguous. If there is only one non-empty tensor,
+    it is returned without a copy (unless it needs to be made contiguous).
+
+    """
+    tensors = tuple(
+        tens for tens in tensors if tens is not None and tens.numel() > 0
     )
 
+    if len(tensors) == 1:
+        return tensors[0].contiguous()
+
+    return torch.hstack(tensors)
+
+
+class CatBuffer(object):
+    """Column concatenation (like _cat) written to reused storage.
+
+    The storage is grown as needed and reused across calls to avoid
+    allocating a new tensor at every forward pass. The returned tensor is
+    overwritten by the next call. Inputs that require gradients are
+    concatenated normally.
+
+    """
+    def __init__(self):
+        self.buffer: Optional[torch.Tensor] = None
+
+    def __call__(self, *tensors) -> torch.Tensor:
+        tensors = tuple(
+            tens for tens in tensors if tens is not None and tens.numel() > 0
+        )
+
+        if len(tensors) == 1:
+            return tensors[0].contiguous()
+
+        if any(tens.requires_grad for tens in tensors):
+            return torch.hstack(tensors)
+
+        first = tensors[0]
+        n = first.size(0)
+        n_cols = sum(tens.size(1) for tens in tensors)
+
+        buf = self.buffer
+        if (
+            buf is None or
+            buf.size(0) < n or
+            buf.size(1) != n_cols or
+            buf.dtype != first.dtype or
+            buf.device != first.device or
+            buf.is_inference() != torch.is_inference_mode_enabled()
+        ):
+            buf = torch.empty((n, n_cols), dtype=first.dtype,
+                              device=first.device)
+            self.buffer = buf
+
+        return torch.cat(tensors, dim=1, out=buf[:n])
+
+
+@contextlib.contextmanager
+def restore_float32_matmul_precision():
+    """Restores the float32 matmul precision (a global torch setting) on exit.
+
+    This can also be used as a function decorator.
+
+    """
+    previous = torch.get_float32_matmul_precision()
+    try:
+        yield
+    finally:
+        torch.set_float32_matmul_precision(previous)
+
+
+def write_json(obj: Any, filename: str) -> None:
+    """Serialize an object to a JSON file using a single write.
+
+    The output is the same as json.dump, which writes the file in many small
+    chunks.
+
+    """
+    payload = json.dumps(obj)
+
+    with open(filename, "wt") as f:
+        f.write(payload)
+
 
 def parse_project_and_run_name(s: str) -> Tuple[str, Optional[str]]:
     """Utility function to parse project and run name.
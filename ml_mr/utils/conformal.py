@@ -10,7 +10,6 @@ import torch.nn.functional as F
 from torch.utils.data import DataLoader
 import pytorch_lightning as pl
 
-import numpy as np
 from .data import IVDataset, FullBatchDataLoader
 from .nn import MLP, OutcomeMLPBase
 
@@ -30,17 +29,22 @@ def estimate_q_hat(
     scores: torch.Tensor,
     alpha: float = 0.1
 ) -> float:
-    n = scores.size(0)
     if scores.ndim == 2:
         scores = scores.reshape(-1)
     elif scores.ndim > 2:
         raise ValueError("Can't interpret tensor as 1d vector.")
 
-    q_hat = torch.quantile(
-        scores,
-        math.ceil((n+1)*(1-alpha)) / n,
-        interpolation="higher"
-    )
+    # Conformal quantile: the ceil((n+1)(1-alpha))-th smallest score.
+    # kthvalue is faster than torch.quantile and has no limit on the number
+    # of elements.
+    n = scores.size(0)
+    k = math.ceil((n + 1) * (1 - alpha))
+    if k > n:
+        raise ValueError(
+            f"Not enough calibration samples (n={n}) for alpha={alpha}."
+        )
+
+    q_hat = torch.kthvalue(scores, k).values
 
     return q_hat.item()
 
@@ -127,16 +131,21 @@ class OutcomeResidualPrediction(MLP):
         x: torch.Tensor,
         covars: Optional[torch.Tensor] = None
     ) -> torch.Tensor:
-        # Get prediction and resid.
         with torch.no_grad():
+            # Get prediction and resid.
             y_hat = self.wrapped_model.x_to_y(x, covars)
             pred_resid = self.forward(x, covars)
 
-        return torch.hstack([
-            y_hat - pred_resid * self.q_hat,
-            y_hat,
-            y_hat + pred_resid * self.q_hat
-        ])
+            # Write the lower bound, prediction and upper bound directly in
+            # the output tensor.
+            k = y_hat.size(1)
+            margin = pred_resid * self.q_hat
+            out = y_hat.new_empty((y_hat.size(0), 3 * k))
+            torch.sub(y_hat, margin, out=out[:, :k])
+            out[:, k:2*k] = y_hat
+            torch.add(y_hat, margin, out=out[:, 2*k:])
+
+        return out
 
     def set_q_hat_from_data(self, dataset):
         """Set the conformal prediction multiplier.
@@ -149,7 +158,6 @@ class OutcomeResidualPrediction(MLP):
         dl = DataLoader(dataset, batch_size=len(dataset))
         x, y, _, covars = next(iter(dl))
 
-        n = x.size(0)
         alpha = self.hparams.alpha  # type: ignore
 
         with torch.no_grad():
@@ -159,9 +167,9 @@ class OutcomeResidualPrediction(MLP):
         actual_abs_resid = torch.abs(y - y_hat)
 
         scores = actual_abs_resid / pred_resid
-        q_hat = torch.quantile(scores, np.ceil((n+1)*(1-alpha))/n)
-
-        self.q_hat = q_hat
+        self.q_hat = torch.tensor(
+            estimate_q_hat(scores, alpha), dtype=scores.dtype
+        )
 
     def forward(self, x, covars):
         xs = [x]
@@ -6,7 +6,7 @@ import os
 
 import pandas as pd
 import numpy as np
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset, DataLoader, Subset, default_collate
 import torch
 
 from ..logging import warn
@@ -143,9 +143,16 @@ class IVDataset(Dataset):
         return ivs.numel()
 
     def n_covars(self) -> int:
-        """Counts the number of covariables."""
-        _, _, _, covars = self[0]
-        return covars.numel()
+        """Counts the number of covariables.
+
+        This uses the shape of the covariables to avoid materializing a
+        sample.
+
+        """
+        if self.covariables.numel() == 0:
+            return 0
+
+        return self.covariables[0].numel()
 
     def n_exog(self) -> int:
         """Counts the number of exogenous variables (IVs + covariables)."""
@@ -167,6 +174,22 @@ class IVDataset(Dataset):
 
         return None
 
+    @staticmethod
+    def load_covariables(input_directory: str) -> Optional[torch.Tensor]:
+        """Loads covariables saved using save_covariables.
+
+        The file is memory-mapped and only tensor data is unpickled. Returns
+        None if no covariables were saved.
+
+        """
+        filename = os.path.join(input_directory, "covariables.pt")
+        try:
+            return torch.load(
+                filename, map_location="cpu", weights_only=True, mmap=True
+            )
+        except FileNotFoundError:
+            return None
+
     @staticmethod
     def from_dataframe(
         dataframe: pd.DataFrame,
@@ -321,6 +344,49 @@ class IVDataset(Dataset):
         )
 
 
+def get_n_covars(dataset: Dataset) -> int:
+    """Counts the number of covariables of a dataset or of a subset of it.
+
+    Subsets (e.g. from random_split) are unwrapped so that the count is read
+    from the underlying dataset instead of indexing a sample.
+
+    """
+    while isinstance(dataset, Subset):
+        dataset = dataset.dataset
+
+    return dataset.n_covars()  # type: ignore
+
+
+def supports_batched_indexing(dataset: Dataset) -> bool:
+    """Whether dataset[indices] returns a whole batch for a list of indices.
+
+    This is the case for in-memory IVDatasets (possibly wrapped in Subsets)
+    because their tensors can be indexed directly.
+
+    """
+    while isinstance(dataset, Subset):
+        dataset = dataset.dataset
+
+    return type(dataset) is IVDataset
+
+
+def get_batch(dataset: Dataset, indices: torch.Tensor) -> List[torch.Tensor]:
+    """Fetches the samples at the given indices as a single batch.
+
+    Subsets are unwrapped and the tensors of in-memory IVDatasets are sliced
+    directly. Other datasets are indexed sample by sample and collated.
+
+    """
+    while isinstance(dataset, Subset):
+        indices = torch.as_tensor(dataset.indices)[indices]
+        dataset = dataset.dataset
+
+    if type(dataset) is IVDataset and dataset.exposure.numel() > 0:
+        return list(dataset[indices])  # type: ignore
+
+    return default_collate([dataset[i] for i in indices.tolist()])
+
+
 class FullBatchDataLoader(DataLoader):
     def __init__(self, dataset: Dataset):
         super().__init__(dataset, batch_size=len(dataset))  # type: ignore
@@ -332,6 +398,52 @@ class FullBatchDataLoader(DataLoader):
     def __iter__(self):
         yield self.payload
 
+    def to(self, device: torch.device) -> "FullBatchDataLoader":
+        """Moves the cached batch to a device (e.g. to keep it on the GPU)."""
+        self.payload = [tens.to(device) for tens in self.payload]
+        return self
+
+
+class InMemoryDataLoader(DataLoader):
+    """Minibatch loader for datasets that fit in memory.
+
+    The dataset is collated once and the minibatches are sliced from the
+    cached tensors. This avoids indexing and collating every sample at every
+    epoch.
+
+    """
+    def __init__(
+        self,
+        dataset: Dataset,
+        batch_size: int,
+        shuffle: bool = False
+    ):
+        super().__init__(dataset, batch_size=batch_size)  # type: ignore
+        self.payload = FullBatchDataLoader(dataset).payload
+        self.shuffle = shuffle
+
+    def __iter__(self):
+        n = len(self.dataset)  # type: ignore
+        device = self.payload[0].device
+
+        if self.shuffle:
+            indices = torch.randperm(n, device=device)
+        else:
+            indices = torch.arange(n, device=device)
+
+        for batch_indices in torch.split(indices, self.batch_size):
+            yield [tens[batch_indices] for tens in self.payload]
+
+    def __len__(self) -> int:
+        n = len(self.dataset)  # type: ignore
+        return (n + self.batch_size - 1) // self.batch_size  # type: ignore
+
+    def to(self, device: torch.device) -> "InMemoryDataLoader":
+        """Moves the cached tensors to a device (e.g. to keep them on the
+        GPU)."""
+        self.payload = [tens.to(device) for tens in self.payload]
+        return self
+
 
 class IVDatasetWithGenotypes(IVDataset):
     def __init__(
@@ -412,6 +524,9 @@ class IVDatasetWithGenotypes(IVDataset):
     def __len__(self) -> int:
         return len(self.genetic_dataset)
 
+    def n_covars(self) -> int:
+        return self.covariable_idx_tens.numel()
+
     @property
     def covariables(self):
         covars = self.genetic_dataset.exog[:, self.covariable_idx_tens]\
@@ -0,0 +1,151 @@
+"""
+Interpolation of one dimensional functions using torch.
+
+The coefficients are computed once and the returned callables only use torch
+operations, so they run on the device of the interpolated points and avoid
+round trips through numpy.
+
+"""
+
+from typing import Callable, Tuple
+
+import torch
+
+
+InterpolationCallable = Callable[[torch.Tensor], torch.Tensor]
+
+
+def _prepare_points(
+    xs: torch.Tensor,
+    ys: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    xs = xs.reshape(-1).to(torch.float64)
+    ys = ys.reshape(-1).to(torch.float64)
+
+    if xs.numel() != ys.numel():
+        raise ValueError("x and y arrays must be equal in length.")
+
+    order = torch.argsort(xs)
+    return xs[order], ys[order]
+
+
+def _piecewise_polynomial(
+    xs: torch.Tensor,
+    coefficients: torch.Tensor,
+    out_dtype: torch.dtype,
+    bounds_error: bool
+) -> InterpolationCallable:
+    """Evaluates polynomials defined on the intervals between knots.
+
+    The coefficients have shape (n_intervals, degree + 1) and are ordered by
+    increasing power of (x - xs[i]).
+
+    """
+    lower, upper = xs[0], xs[-1]
+    n_intervals = coefficients.size(0)
+
+    def interpolate_torch(x):
+        x = torch.as_tensor(x, device=xs.device)
+        x_flat = x.reshape(-1).to(xs.dtype)
+
+        out_of_bounds = (x_flat < lower) | (x_flat > upper)
+        if bounds_error and out_of_bounds.any():
+            raise ValueError(
+                "A value in x_new is outside of the interpolation range."
+            )
+
+        idx = torch.searchsorted(xs, x_flat, right=True) - 1
+        idx = torch.clamp(idx, 0, n_intervals - 1)
+        t = x_flat - xs[idx]
+        coefs = coefficients[idx]
+
+        # Horner's method.
+        y = coefs[:, -1]
+        for k in range(coefficients.size(1) - 2, -1, -1):
+            y = y * t + coefs[:, k]
+
+        y = torch.where(out_of_bounds, torch.nan, y)
+
+        return y.to(out_dtype).reshape(x.shape)
+
+    return interpolate_torch
+
+
+def linear_interpolator(
+    xs: torch.Tensor,
+    ys: torch.Tensor,
+    bounds_error: bool = True
+) -> InterpolationCallable:
+    out_dtype = ys.dtype if ys.is_floating_point() else torch.float64
+    xs, ys = _prepare_points(xs, ys)
+
+    slopes = torch.diff(ys) / torch.diff(xs)
+    coefficients = torch.stack((ys[:-1], slopes), dim=1)
+
+    return _piecewise_polynomial(xs, coefficients, out_dtype, bounds_error)
+
+
+def cubic_spline_interpolator(
+    xs: torch.Tensor,
+    ys: torch.Tensor,
+    bounds_error: bool = True
+) -> InterpolationCallable:
+    """Cubic spline with not-a-knot boundary conditions.
+
+    This is the same spline as scipy's interp1d(..., kind="cubic"). The second
+    derivatives at the knots are obtained by solving a tridiagonal system with
+    the Thomas algorithm.
+
+    """
+    out_dtype = ys.dtype if ys.is_floating_point() else torch.float64
+    xs, ys = _prepare_points(xs, ys)
+
+    n = xs.numel()
+    if n < 4:
+        raise ValueError("Cubic interpolation requires at least 4 points.")
+
+    h = torch.diff(xs)
+    slopes = torch.diff(ys) / h
+
+    # System for the second derivatives M_1, ..., M_{n-2}. The not-a-knot
+    # conditions are used to eliminate M_0 and M_{n-1}.
+    lower = h[:-1].clone()
+    diag = 2 * (h[:-1] + h[1:])
+    upper = h[1:].clone()
+    rhs = 6 * torch.diff(slopes)
+
+    diag[0] += h[0] * (h[0] + h[1]) / h[1]
+    upper[0] -= h[0] ** 2 / h[1]
+    diag[-1] += h[-1] * (h[-2] + h[-1]) / h[-2]
+    lower[-1] -= h[-1] ** 2 / h[-2]
+
+    # Thomas algorithm (the system is small, do it on the CPU).
+    a, b, c, d = (
+        tens.cpu().tolist() for tens in (lower, diag, upper, rhs)
+    )
+    m = len(b)
+    for i in range(1, m):
+        w = a[i] / b[i - 1]
+        b[i] -= w * c[i - 1]
+        d[i] -= w * d[i - 1]
+
+    interior = [0.0] * m
+    interior[-1] = d[-1] / b[-1]
+    for i in range(m - 2, -1, -1):
+        interior[i] = (d[i] - c[i] * interior[i + 1]) / b[i]
+
+    M_inner = torch.tensor(interior, dtype=xs.dtype, device=xs.device)
+    M_0 = ((h[0] + h[1]) * M_inner[0] - h[0] * M_inner[1]) / h[1]
+    M_last = (
+        (h[-2] + h[-1]) * M_inner[-1] - h[-1] * M_inner[-2]
+    ) / h[-2]
+    M = torch.cat((M_0.reshape(1), M_inner, M_last.reshape(1)))
+
+    coefficients = torch.stack((
+        ys[:-1],
+        slopes - h * (2 * M[:-1] + M[1:]) / 6,
+        M[:-1] / 2,
+        (M[1:] - M[:-1]) / (6 * h),
+    ), dim=1)
+
+    return _piecewise_polynomial(xs, coefficients, out_dtype, bounds_error)
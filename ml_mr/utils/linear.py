@@ -6,6 +6,29 @@ from typing import Tuple, Optional
 
 import torch
 
+from ..logging import warn
+
+
+def _solve_normal_equations(
+    L: torch.Tensor,
+    rhs: torch.Tensor
+) -> torch.Tensor:
+    try:
+        L_chol = torch.linalg.cholesky(L)
+    except RuntimeError:
+        # Singular system (e.g. collinear instruments). The only CUDA lstsq
+        # driver (gels) assumes a full rank matrix, so we can't recover there.
+        if L.device.type != "cpu":
+            raise RuntimeError(
+                "Rank deficient design matrix, can't solve the normal "
+                "equations on this device."
+            )
+
+        warn("Rank deficient design matrix, using a least squares solver.")
+        return torch.linalg.lstsq(L, rhs, driver="gelsd").solution
+
+    return torch.cholesky_solve(rhs, L_chol)
+
 
 def ridge_regression(
     x: torch.Tensor,
@@ -13,19 +36,28 @@ def ridge_regression(
     alpha: float,
     device: Optional[torch.device] = None
 ) -> torch.Tensor:
+    """Ridge regression.
+
+    With alpha > 0, the penalized normal equations are solved with a Cholesky
+    factorization. This is cheap to differentiate through, which matters in
+    DFIV where the fit is part of the training graph. Without a penalty, the
+    normal equations are not formed and the least squares problem is solved
+    directly, which is more accurate. On CPU, the default lstsq driver is also
+    robust to rank deficient designs.
+
+    """
     n_samples, n_features = x.shape
     assert y.shape[0] == n_samples
 
-    L = x.T @ x + alpha * torch.eye(n_features, device=device)
-    try:
-        L_chol = torch.linalg.cholesky(L)
-    except Exception as e:
-        print(e)
-        raise RuntimeError()
+    if alpha == 0:
+        return torch.linalg.lstsq(x, y).solution
+
+    if device is None:
+        device = x.device
 
-    betas = torch.cholesky_solve(x.T @ y, L_chol)
+    L = x.T @ x + alpha * torch.eye(n_features, dtype=x.dtype, device=device)
 
-    return betas
+    return _solve_normal_equations(L, x.T @ y)
 
 
 def ridge_fit_predict(
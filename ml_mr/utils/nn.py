@@ -11,6 +11,7 @@ import torch.nn as nn
 from torch.utils.data import DataLoader
 import torch.nn.functional as F
 
+from . import _cat
 from .quantiles import quantile_loss
 from .linear import ridge_regression
 from ..utils.data import IVDataset, SupervisedLearningWrapper
@@ -326,7 +327,9 @@ class OutcomeMLPBase(MLP):
         else:
             loss = self.loss(y_hat, y)
 
-        self.log(f"outcome_{log_prefix}_loss", loss)
+        self.log(
+            f"outcome_{log_prefix}_loss", loss, on_step=False, on_epoch=True
+        )
 
         return loss
 
@@ -336,29 +339,27 @@ class OutcomeMLPBase(MLP):
         covars: Optional[torch.Tensor],
         taus: Optional[Union[torch.Tensor, float]] = None
     ) -> torch.Tensor:
-        if taus is not None and not self.hparams.sqr:  # type: ignore
-            raise ValueError("Can't provide tau if SQR not enabled.")
+        """Predicts the outcome from the exposure.
 
-        stack = [x]
+        The exposure values are used directly as the input of the outcome MLP
+        (the exposure network is not evaluated).
 
-        if covars is not None and covars.numel() > 0:
-            stack.append(covars)
+        """
+        if taus is not None and not self.hparams.sqr:  # type: ignore
+            raise ValueError("Can't provide tau if SQR not enabled.")
 
         if taus is None and self.hparams.sqr:  # type: ignore
             # Predict median by default.
-            taus = torch.full((x.size(0), 1), 0.5)
-
-        if taus is not None:
-            if isinstance(taus, torch.Tensor):
-                stack.append(taus)
-            elif isinstance(taus, float):
-                stack.append(torch.full((x.size(0), 1), taus))
-            else:
-                raise ValueError("Provide vector of taus or float.")
+            taus = 0.5
 
-        x = torch.hstack(stack)
+        if isinstance(taus, float):
+            taus = torch.full(
+                (x.size(0), 1), taus, dtype=x.dtype, device=x.device
+            )
+        elif taus is not None and not isinstance(taus, torch.Tensor):
+            raise ValueError("Provide vector of taus or float.")
 
-        return self.mlp(x)
+        return self.mlp(_cat(x, covars, taus))
 
     def forward(  # type: ignore
         self,
@@ -8,6 +8,7 @@ simultaneous quantile regression (see Tagasovska & Lopez-Paz NeurIPS 2019).
 
 
 import torch
+import torch.nn as nn
 
 
 def quantile_loss(
@@ -25,20 +26,32 @@ def quantile_loss(
     return (mask * diff).mean()
 
 
-class QuantileLossMulti(object):
-    """Fits multiple (but discrete) quantile losses simultaneously."""
+class QuantileLossMulti(nn.Module):
+    """Fits multiple (but discrete) quantile losses simultaneously.
+
+    The quantiles are a (non-persistent) buffer so that they follow the
+    device of the model using the loss.
+
+    """
     def __init__(self, quantiles: torch.Tensor):
-        self.quantiles = quantiles
+        super().__init__()
+        self.register_buffer("quantiles", quantiles, persistent=False)
 
-    def __call__(
+    def forward(
         self,
         input: torch.Tensor,
         target: torch.Tensor,
         reduction: str = "mean"
     ) -> torch.Tensor:
-        y_1 = torch.maximum(target - input, torch.zeros_like(target))
-        y_2 = torch.maximum(input - target, torch.zeros_like(target))
-        loss = (y_1 @ self.quantiles + y_2 @ (1 - self.quantiles))
+        # The loss is computed in full precision even when training with
+        # mixed precision (autocast would run the matmul in half precision).
+        diff = target.float() - input.float()
+        y_1 = torch.relu(diff)
+        y_2 = torch.relu(-diff)
+        quantiles = self.quantiles.float()
+        loss = (
+            (y_1 * quantiles).sum(dim=1) + (y_2 * (1 - quantiles)).sum(dim=1)
+        )
 
         if reduction == "mean":
             return loss.mean()
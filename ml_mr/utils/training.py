@@ -7,13 +7,14 @@ from typing import Union, Optional, Iterable
 
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader
+from torch.utils.data import BatchSampler, DataLoader, RandomSampler
 import pytorch_lightning as pl
 from pytorch_lightning.loggers import Logger
 
 from ..logging import info
 from . import parse_project_and_run_name
-from .data import Dataset, FullBatchDataLoader
+from .data import (Dataset, FullBatchDataLoader, InMemoryDataLoader,
+                   supports_batched_indexing)
 
 
 def resample_dataset(dataset: Dataset) -> Dataset:
@@ -47,9 +48,27 @@ def resample_dataset(dataset: Dataset) -> Dataset:
             bs_idx = bootstrap_idx[idx]
             return dataset[bs_idx]
 
+        def __getitems__(self, indices):
+            # Defined explicitly so that the DataLoader doesn't use the
+            # batched indexing of the wrapped dataset through __getattr__.
+            bs_indices = [bootstrap_idx[idx] for idx in indices]
+            getitems = getattr(dataset, "__getitems__", None)
+            if getitems is None:
+                return [dataset[idx] for idx in bs_indices]
+
+            return getitems(bs_indices)
+
     return ResampledDataset()
 
 
+def _dataset_nbytes(dataset: Dataset) -> int:
+    """Estimates the memory used by a dataset from its first sample."""
+    sample_nbytes = sum(
+        tens.element_size() * tens.numel() for tens in dataset[0]
+    )
+    return sample_nbytes * len(dataset)  # type: ignore
+
+
 def train_model(
     train_dataset: Dataset,
     val_dataset: Dataset,
@@ -62,17 +81,71 @@ def train_model(
     accelerator: Optional[str] = None,
     wandb_project: Optional[str] = None,
     early_stopping_patience: int = 20,
-    use_full_batch_validation: bool = True
+    use_full_batch_validation: bool = True,
+    use_full_batch_training: bool = False,
+    precision: str = "32-true",
+    pin_memory: bool = False,
+    num_workers: int = 0,
+    persistent_workers: bool = True,
+    prefetch_factor: Optional[int] = 4,
+    small_dataset_threshold: Optional[int] = None
 ) -> float:
+    """Fits a model using Pytorch Lightning and returns the best value of the
+    monitored metric.
+
+    If small_dataset_threshold is set (in bytes), training datasets that are
+    smaller are cached and copied to the accelerator once. The minibatches are
+    then sliced from the cached tensors instead of using the DataLoader.
+
+    """
     if not checkpoint_filename.endswith(".ckpt"):
         checkpoint_filename += ".ckpt"
 
-    train_dataloader = DataLoader(
-        train_dataset,
-        batch_size=batch_size,
-        shuffle=True,
-        num_workers=0,
-    )
+    # The worker options are only valid with worker processes. Persistent
+    # workers are not respawned at every epoch.
+    worker_kwargs = {}
+    if num_workers > 0:
+        worker_kwargs = {
+            "persistent_workers": persistent_workers,
+            "prefetch_factor": prefetch_factor,
+        }
+
+    train_dataloader: DataLoader
+    if use_full_batch_training:
+        train_dataloader = FullBatchDataLoader(train_dataset)
+    elif (
+        small_dataset_threshold is not None and
+        _dataset_nbytes(train_dataset) <= small_dataset_threshold
+    ):
+        train_dataloader = InMemoryDataLoader(
+            train_dataset, batch_size=batch_size, shuffle=True
+        )
+    elif supports_batched_indexing(train_dataset):
+        # The dataset is indexed with the list of indices of the whole
+        # minibatch, which returns the batched tensors directly. Disabling
+        # automatic batching (batch_size=None) makes the collate function a
+        # pass-through, so there is no per-sample stacking.
+        train_dataloader = DataLoader(
+            train_dataset,
+            batch_size=None,
+            sampler=BatchSampler(
+                RandomSampler(train_dataset), batch_size, drop_last=False
+            ),
+            num_workers=num_workers,
+            pin_memory=pin_memory,
+            **worker_kwargs  # type: ignore
+        )
+    else:
+        train_dataloader = DataLoader(
+            train_dataset,
+            batch_size=batch_size,
+            shuffle=True,
+            num_workers=num_workers,
+            # Page-locked batches can be copied asynchronously to the GPU.
+            # Lightning already uses non_blocking transfers for these.
+            pin_memory=pin_memory,
+            **worker_kwargs  # type: ignore
+        )
 
     if use_full_batch_validation:
         val_dataloader = FullBatchDataLoader(val_dataset)
@@ -110,6 +183,7 @@ def train_model(
         log_every_n_steps=1,
         max_epochs=max_epochs,
         accelerator=accelerator,  # type: ignore
+        precision=precision,  # type: ignore
         callbacks=[
             pl.callbacks.EarlyStopping(
                 monitor=monitored_metric, patience=early_stopping_patience
@@ -119,6 +193,15 @@ def train_model(
         logger=logger,
         enable_progress_bar=os.environ.get("ML_MR_QUIET", "0") != "1"
     )
+
+    cached_loaders = (FullBatchDataLoader, InMemoryDataLoader)
+    if isinstance(train_dataloader, cached_loaders):
+        # Copy the data to the device once instead of at every step.
+        device = trainer.strategy.root_device
+        for dl in (train_dataloader, val_dataloader):
+            if isinstance(dl, cached_loaders):
+                dl.to(device)
+
     trainer.fit(model, train_dataloader, val_dataloader)  # type: ignore
 
     # Return the best score on the tracked metric.